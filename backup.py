@@ -1,6 +1,7 @@
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, NamedStyle
+from openpyxl.utils import get_column_letter
 import time
 
 
@@ -26,6 +27,24 @@ def calculate_insurance_rate(loan_percentage, loan_period):
     return None
 
 
+# ---------------------------------------------------
+# EXCEL COLUMNS
+# ---------------------------------------------------
+HEADERS = (
+    "Sample No",
+    "Customer Reference Number",
+    "Customer Name",
+    "City State",
+    "Purchase Value & Down Payment",
+    "Loan Period & Annuity Interest",
+    "Guarantor Name",
+    "Guarantor Reference Number",
+    "Loan Amount & Principal",
+    "Total Interest for Loan",
+    "Period & Property Insurance per Month",
+)
+
+
 # ---------------------------------------------------
 # MAIN CALCULATION FUNCTION
 # ---------------------------------------------------
@@ -63,26 +82,21 @@ def process_record(data):
         insurance_per_annum = loan_amount * rate
         insurance_monthly = round(insurance_per_annum / 12, 2)
 
-    # 7. Row for Excel
-    return {
-        "Sample No": data["sample_no"],
-        "Customer Reference Number": data["customer_reference"],
-        "Customer Name": data["customer_name"],
-        "City State": data["city_state"],
-        "Purchase Value & Down Payment":
-            f"$  {purchase_value:,.2f} and {data['down_payment']}%",
-        "Loan Period & Annuity Interest":
-            f"{data['loan_period']} Years and {data['annuity_interest']}%",
-        "Guarantor Name": data["guarantor_name"],
-        "Guarantor Reference Number": data["guarantor_reference"],
-        "Loan Amount & Principal":
-            f"$  {loan_amount:,.2f} , {principal:,.2f}",
-        "Total Interest for Loan":
-            f"$  {total_interest:,.2f}",
-        "Period & Property Insurance per Month":
-            "NA" if insurance_monthly == "NA"
-            else f"$  {insurance_monthly:,.2f}"
-    }
+    # 7. Row for Excel (same order as HEADERS)
+    return (
+        data["sample_no"],
+        data["customer_reference"],
+        data["customer_name"],
+        data["city_state"],
+        f"$  {purchase_value:,.2f} and {data['down_payment']}%",
+        f"{data['loan_period']} Years and {data['annuity_interest']}%",
+        data["guarantor_name"],
+        data["guarantor_reference"],
+        f"$  {loan_amount:,.2f} , {principal:,.2f}",
+        f"$  {total_interest:,.2f}",
+        "NA" if insurance_monthly == "NA"
+        else f"$  {insurance_monthly:,.2f}"
+    )
 
 
 # ---------------------------------------------------
@@ -111,50 +125,80 @@ records = [
 # CREATE EXCEL FILE (SAFE NAME)
 # ---------------------------------------------------
 rows = [process_record(r) for r in records]
-df = pd.DataFrame(rows)
 
 file_name = f"loan_calculation_{int(time.time())}.xlsx"
-df.to_excel(file_name, index=False)
 
 
 # ---------------------------------------------------
 # EXCEL FORMATTING (BIG FONT + BIG CELLS)
 # ---------------------------------------------------
-wb = load_workbook(file_name)
-ws = wb.active
+# Write-only workbook: rows go straight to the file as they are appended,
+# so the sheet layout is set up before the first row.
+wb = Workbook(write_only=True)
+ws = wb.create_sheet("Sheet1")
 
 # Column width
-for col in ws.columns:
-    ws.column_dimensions[col[0].column_letter].width = 34
+for col in range(1, len(HEADERS) + 1):
+    ws.column_dimensions[get_column_letter(col)].width = 34
 
-# Row height
-for r in range(1, ws.max_row + 1):
-    ws.row_dimensions[r].height = 34
+# Row height (sheet default, instead of one entry per row)
+ws.sheet_format.defaultRowHeight = 34
+ws.sheet_format.customHeight = True
 
-# Fonts
-header_font = Font(bold=True, size=16)
-data_font = Font(size=14)
+# Freeze header row
+ws.freeze_panes = "A2"
 
-# Header style
-for cell in ws[1]:
-    cell.font = header_font
-    cell.alignment = Alignment(
+# Styles (built once and shared by every cell)
+header_style = NamedStyle(
+    name="header",
+    font=Font(bold=True, size=16),
+    alignment=Alignment(
         horizontal="center",
         vertical="center",
         wrap_text=True
     )
+)
+data_style = NamedStyle(
+    name="data",
+    font=Font(size=14),
+    alignment=Alignment(
+        vertical="center",
+        wrap_text=True
+    )
+)
+wb.add_named_style(header_style)
+wb.add_named_style(data_style)
+
+# Each named style already holds a StyleArray resolved against this
+# workbook's font / alignment tables. Every cell of a row type shares it
+# through cell._style, which skips openpyxl's per-assignment style
+# lookups. The cell.style setter would store a copy instead; sharing the
+# one array is only safe because this sheet is write-only, so each row
+# is serialized as soon as it is appended and no cell can be restyled
+# afterwards. Falls back to the named style when the installed openpyxl
+# has no such array.
+header_array = getattr(header_style, "as_tuple", lambda: None)()
+data_array = getattr(data_style, "as_tuple", lambda: None)()
+
+
+def styled_cells(values, style_array, style_name):
+    # pick the styling path once per row, then one attribute write per cell
+    cells = [WriteOnlyCell(ws, value=value) for value in values]
+    if style_array is not None:
+        for cell in cells:
+            cell._style = style_array
+    else:
+        for cell in cells:
+            cell.style = style_name
+    return cells
 
-# Data cell style
-for row in ws.iter_rows(min_row=2):
-    for cell in row:
-        cell.font = data_font
-        cell.alignment = Alignment(
-            vertical="center",
-            wrap_text=True
-        )
 
-# Freeze header row
-ws.freeze_panes = "A2"
+# Header row, written from HEADERS
+ws.append(styled_cells(HEADERS, header_array, "header"))
+
+# Data rows
+for row in rows:
+    ws.append(styled_cells(row, data_array, "data"))
 
 wb.save(file_name)
 
@@ -1,13 +1,20 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from dataclasses import dataclass, fields
+from operator import itemgetter
 from typing import List
-import pandas as pd
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Alignment
-import uuid
-import os
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+import numpy as np
+import orjson
+from numba import njit, prange, vectorize
+from xml.sax.saxutils import escape
+import zipfile
+import re
+import math
+import io
+import threading
 
 app = FastAPI(title="Loan Excel Generator API")
 
@@ -21,9 +28,11 @@ app.add_middleware(
 )
 
 # ---------------- INSURANCE LOGIC ----------------
-def calculate_insurance_rate(loan_percentage: float, loan_period: int):
+# The insurance bands, as originally specified. NaN means "NA".
+@njit(cache=True)
+def _band_rate(loan_percentage, loan_period):
     if loan_percentage > 95.01:
-        return None
+        return np.nan
     if 70 <= loan_percentage <= 80.99:
         return 0.0032
     if loan_percentage == 81:
@@ -32,71 +41,418 @@ def calculate_insurance_rate(loan_percentage: float, loan_period: int):
         return 0.0041 if loan_period <= 25 else 0.0052
     if 90.01 <= loan_percentage <= 95:
         return 0.0067 if loan_period <= 25 else 0.0078
-    return None
+    return np.nan
+
+# _band_rate evaluated on every loan percentage in hundredths (8100 ->
+# 81%), column 0 for loan periods up to 25 years, column 1 above. The
+# last row catches everything above 95%.
+_RATE = np.array([
+    (_band_rate(i / 100, 25), _band_rate(i / 100, 26)) for i in range(9502)
+])
+
+# 1e-9 of a percent, in hundredths
+_SNAP_TOLERANCE = 1e-7
+
+@njit(cache=True)
+def _insurance_rate(loan_percentage, loan_period):
+    # percentages within float noise of a hundredth are looked up; finer
+    # ones go through the bands themselves
+    hundredths = loan_percentage * 100
+    idx = round(hundredths)
+    if abs(hundredths - idx) <= _SNAP_TOLERANCE:
+        idx = min(max(int(idx), 0), _RATE.shape[0] - 1)
+        return _RATE[idx, 0 if loan_period <= 25 else 1]
+    return _band_rate(loan_percentage, loan_period)
+
+# batch version of _insurance_rate, one compiled loop over the loan
+# percentage and loan period arrays
+@vectorize(["float64(float64, int64)"], nopython=True, cache=True)
+def _insurance_rates(loan_percentage, loan_period):
+    return _insurance_rate(loan_percentage, loan_period)
+
+def calculate_insurance_rate(loan_percentage: float, loan_period: int):
+    rate = _insurance_rate(loan_percentage, loan_period)
+    return None if math.isnan(rate) else rate
 
 # ---------------- REQUEST MODEL ----------------
-class LoanInput(BaseModel):
+@dataclass(slots=True)
+class LoanInput:
     sample_no: str
     customer_reference: str
     customer_name: str
     city_state: str
 
-    A: float = Field(gt=0)
-    down_payment: float = Field(ge=0, le=100)
-    loan_period: int = Field(gt=0, le=40)
-    annuity_interest: float = Field(ge=0, le=100)
+    A: float
+    down_payment: float
+    loan_period: int
+    annuity_interest: float
 
-    purchase_value_reduction: float = Field(ge=0, le=100)
-    monthly_principal_reduction: float = Field(ge=0, le=100)
-    total_interest_reduction: float = Field(ge=0, le=100)
+    purchase_value_reduction: float
+    monthly_principal_reduction: float
+    total_interest_reduction: float
 
     guarantor_name: str
     guarantor_reference: str
 
+# picks the LoanInput fields out of a request dict, ignoring extra keys
+_loan_fields = itemgetter(*(f.name for f in fields(LoanInput)))
+
+_TEXT_FIELDS = tuple(f.name for f in fields(LoanInput) if f.type is str)
+
+def _check(field: str, ok, requirement: str):
+    if not ok.all():
+        i = int(np.argmin(ok))
+        raise HTTPException(
+            status_code=422,
+            detail=f"records[{i}].{field} must be {requirement}"
+        )
+
+def _column(records: List[LoanInput], field: str):
+    try:
+        values = np.fromiter(
+            (getattr(r, field) for r in records), np.float64, len(records)
+        )
+    except (TypeError, ValueError):
+        # slow path, only to find which record is not a number
+        ok = []
+        for r in records:
+            try:
+                np.fromiter((getattr(r, field),), np.float64, 1)
+                ok.append(True)
+            except (TypeError, ValueError):
+                ok.append(False)
+        _check(field, np.array(ok), "a number")
+        raise
+
+    # null comes through as NaN
+    _check(field, ~np.isnan(values), "a number")
+    return values
+
+def load_records(raw: List[dict]):
+    # Fields are type- and range-checked once per batch on whole columns
+    # instead of by a validator per field per record. Returns the
+    # records and their numeric columns in _compute_arrays order.
+    try:
+        records = [LoanInput(*_loan_fields(r)) for r in raw]
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"Missing field {e}")
+    except TypeError:
+        raise HTTPException(status_code=422, detail="Each record must be an object")
+
+    for field in _TEXT_FIELDS:
+        _check(
+            field,
+            np.fromiter(
+                (isinstance(getattr(r, field), str) for r in records),
+                bool, len(records)
+            ),
+            "a string"
+        )
+
+    A = _column(records, "A")
+    purchase_value_reduction = _column(records, "purchase_value_reduction")
+    down_payment = _column(records, "down_payment")
+    loan_period = _column(records, "loan_period")
+    annuity_interest = _column(records, "annuity_interest")
+    monthly_principal_reduction = _column(records, "monthly_principal_reduction")
+    total_interest_reduction = _column(records, "total_interest_reduction")
+
+    _check("A", A > 0, "greater than 0")
+    _check(
+        "loan_period",
+        (0 < loan_period) & (loan_period <= 40)
+        & (loan_period == np.floor(loan_period)),
+        "a whole number from 1 to 40"
+    )
+    for field, values in (
+        ("down_payment", down_payment),
+        ("annuity_interest", annuity_interest),
+        ("purchase_value_reduction", purchase_value_reduction),
+        ("monthly_principal_reduction", monthly_principal_reduction),
+        ("total_interest_reduction", total_interest_reduction),
+    ):
+        _check(field, (0 <= values) & (values <= 100), "between 0 and 100")
+
+    return records, (
+        A, purchase_value_reduction, down_payment,
+        loan_period.astype(np.int64), annuity_interest,
+        monthly_principal_reduction, total_interest_reduction
+    )
+
 # ---------------- CALCULATION ----------------
-def process_record(data: LoanInput):
-    purchase_value = data.A * data.purchase_value_reduction / 100
-    loan_amount = purchase_value * data.down_payment / 100
+# Batches at least this large are spread over threads; below it starting
+# the thread team costs more than it saves.
+PARALLEL_THRESHOLD = 512
+
+# Requests run on a threadpool, but numba's fallback "workqueue" threading
+# layer aborts the process if two threads enter a parallel region at once,
+# so the threaded kernel is only ever run by one request at a time.
+_parallel_lock = threading.Lock()
 
-    base_principal = (loan_amount / data.loan_period) / 12
+@njit(cache=True)
+def _loan_values(A, purchase_value_reduction, down_payment, loan_period,
+                 annuity_interest, monthly_principal_reduction,
+                 total_interest_reduction):
+    # works on single values and element-wise on whole arrays
+    purchase_value = A * purchase_value_reduction / 100
+    loan_amount = purchase_value * down_payment / 100
+
+    base_principal = (loan_amount / loan_period) / 12
     principal = base_principal - (
-        base_principal * data.monthly_principal_reduction / 100
+        base_principal * monthly_principal_reduction / 100
     )
 
-    base_interest = loan_amount * data.loan_period
-    interest_value = base_interest * data.annuity_interest / 100
+    base_interest = loan_amount * loan_period
+    interest_value = base_interest * annuity_interest / 100
     total_interest = interest_value - (
-        interest_value * data.total_interest_reduction / 100
+        interest_value * total_interest_reduction / 100
+    )
+
+    return purchase_value, loan_amount, principal, total_interest
+
+@njit(parallel=True, cache=True)
+def _compute_batch(A, purchase_value_reduction, down_payment, loan_period,
+                   annuity_interest, monthly_principal_reduction,
+                   total_interest_reduction, out):
+    for i in prange(A.size):
+        purchase_value, loan_amount, principal, total_interest = _loan_values(
+            A[i],
+            purchase_value_reduction[i],
+            down_payment[i],
+            loan_period[i],
+            annuity_interest[i],
+            monthly_principal_reduction[i],
+            total_interest_reduction[i],
+        )
+        rate = _insurance_rate(100 - down_payment[i], loan_period[i])
+
+        out[0, i] = purchase_value
+        out[1, i] = loan_amount
+        out[2, i] = principal
+        out[3, i] = total_interest
+        out[4, i] = loan_amount * rate / 12
+
+def _compute_arrays(A, purchase_value_reduction, down_payment, loan_period,
+                    annuity_interest, monthly_principal_reduction,
+                    total_interest_reduction):
+    inputs = (
+        A, purchase_value_reduction, down_payment, loan_period,
+        annuity_interest, monthly_principal_reduction,
+        total_interest_reduction
     )
 
-    loan_percentage = 100 - data.down_payment
-    rate = calculate_insurance_rate(loan_percentage, data.loan_period)
+    if A.size >= PARALLEL_THRESHOLD:
+        out = np.empty((5, A.size))
+        with _parallel_lock:
+            _compute_batch(*inputs, out)
+        return tuple(out)
 
-    insurance_monthly = (
-        "NA" if rate is None else round((loan_amount * rate) / 12, 2)
+    purchase_value, loan_amount, principal, total_interest = _loan_values(*inputs)
+
+    loan_percentage = 100 - down_payment
+    rate = _insurance_rates(loan_percentage, loan_period)
+    insurance_monthly = loan_amount * rate / 12
+
+    return purchase_value, loan_amount, principal, total_interest, insurance_monthly
+
+# compile both paths at import so the first request doesn't pay for it
+for _n in (1, PARALLEL_THRESHOLD):
+    _compute_arrays(*[np.ones(_n)] * 3, np.ones(_n, np.int64), *[np.ones(_n)] * 3)
+
+def process_records(records: List[LoanInput], columns):
+    down_payment, loan_period, annuity_interest = columns[2:5]
+    values = (
+        c.tolist()
+        for c in (down_payment, loan_period, annuity_interest,
+                  *_compute_arrays(*columns))
     )
 
-    return {
-        "Sample no,record no": data.sample_no,
-        "Customer Reference Number": data.customer_reference,
-        "Customer Name": data.customer_name,
-        "City , State": data.city_state,
-        "Purchase Value AND Down Payment":
-            f"$  {purchase_value:,.2f} and {data.down_payment}%",
-        "Loan Period AND Annuity Interest":
-            f"{data.loan_period} YEARS and {data.annuity_interest}%",
-        "Guarantor Name": data.guarantor_name,
-        "Guarantor Reference Number": data.guarantor_reference,
-        "Loan Amount AND Principal":
+    # rows are built lazily, one at a time, as the writer consumes them;
+    # values are in HEADERS order
+    return (
+        (
+            data.sample_no,
+            data.customer_reference,
+            data.customer_name,
+            data.city_state,
+            f"$  {purchase_value:,.2f} and {down_payment}%",
+            f"{loan_period} YEARS and {annuity_interest}%",
+            data.guarantor_name,
+            data.guarantor_reference,
             f"$  {loan_amount:,.2f} and $ {principal:,.2f}",
-        "Total Interest for Loan period AND Property Insurance per Month":
-      (
-        f"$  {total_interest:,.2f}"
-        if insurance_monthly == "NA"
-        else f"$  {total_interest:,.2f} and $  {insurance_monthly:,.2f}"
-     )
-        
-    }
+            f"$  {total_interest:,.2f}"
+            if math.isnan(insurance_monthly)
+            else f"$  {total_interest:,.2f} and $  {insurance_monthly:,.2f}"
+        )
+        for data, down_payment, loan_period, annuity_interest,
+            purchase_value, loan_amount, principal,
+            total_interest, insurance_monthly in zip(records, *values)
+    )
+
+# ---------------- XLSX WRITER ----------------
+# The sheet has a fixed layout, so the XLSX parts are written directly
+# instead of going through pandas and an Excel engine.
+COLUMN_WIDTHS = [
+    25.71, 64.86, 39.71, 27.14, 47.14,
+    39.29, 38.43, 94.43, 46.86, 26.14
+]
+ROW_HEIGHT = 18.75
+
+HEADERS = (
+    "Sample no,record no",
+    "Customer Reference Number",
+    "Customer Name",
+    "City , State",
+    "Purchase Value AND Down Payment",
+    "Loan Period AND Annuity Interest",
+    "Guarantor Name",
+    "Guarantor Reference Number",
+    "Loan Amount AND Principal",
+    "Total Interest for Loan period AND Property Insurance per Month",
+)
+
+# cellXfs indices in STYLES_XML
+HEADER_STYLE = 1
+DATA_STYLE = 2
+
+CONTENT_TYPES_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    b'<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    b'<Default Extension="xml" ContentType="application/xml"/>'
+    b'<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    b'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    b'<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    b'</Types>'
+)
+
+ROOT_RELS_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    b'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    b'</Relationships>'
+)
+
+WORKBOOK_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    b'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    b'<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+    b'</workbook>'
+)
+
+WORKBOOK_RELS_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    b'<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    b'<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    b'</Relationships>'
+)
+
+# fonts: default, header (bold 14), data (14)
+STYLES_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    b'<fonts count="3">'
+    b'<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    b'<font><b/><sz val="14"/><name val="Calibri"/><family val="2"/></font>'
+    b'<font><sz val="14"/><name val="Calibri"/><family val="2"/></font>'
+    b'</fonts>'
+    b'<fills count="2">'
+    b'<fill><patternFill patternType="none"/></fill>'
+    b'<fill><patternFill patternType="gray125"/></fill>'
+    b'</fills>'
+    b'<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    b'<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    b'<cellXfs count="3">'
+    b'<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    b'<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    b'<alignment horizontal="center" vertical="center" wrapText="1"/></xf>'
+    b'<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    b'<alignment vertical="center" wrapText="1"/></xf>'
+    b'</cellXfs>'
+    b'<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    b'</styleSheet>'
+)
+
+# Characters XML 1.0 does not allow are written as Excel's _xHHHH_
+# escapes, as xlsxwriter does. Text that already looks like such an
+# escape has its underscore encoded (_x005F_) so Excel shows it verbatim.
+_EXCEL_ESCAPES = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]|_(?=x[0-9a-fA-F]{4}_)")
+
+def _excel_escape(match) -> str:
+    return f"_x{ord(match.group()):04X}_"
+
+def _cell_text(value) -> str:
+    text = str(value)
+    # cheap pre-check; almost no cell needs the regex
+    if not text.isprintable() or "_x" in text:
+        text = _EXCEL_ESCAPES.sub(_excel_escape, text)
+    return escape(text)
+
+# '<c r="A' ... '<c r="J', one per column
+_CELL_OPEN = tuple(f'<c r="{col}' for col in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[:len(HEADERS)])
+
+def _sheet_row(r: int, values, style: int) -> str:
+    # one join over a flat list; only the row number and the text vary
+    cell = f'" s="{style}" t="inlineStr"><is><t xml:space="preserve">'
+    return "".join([
+        f'<row r="{r}">',
+        *[
+            f'{open_}{r}{cell}{_cell_text(value)}</t></is></c>'
+            for open_, value in zip(_CELL_OPEN, values)
+        ],
+        '</row>'
+    ])
+
+# Everything in sheet1.xml up to the first data row never changes, so it
+# is rendered once here: freeze pane, column widths and the header row.
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '<selection pane="bottomLeft"/>'
+    '</sheetView></sheetViews>'
+    # every row has the same height, set once instead of per row
+    f'<sheetFormatPr defaultRowHeight="{ROW_HEIGHT}" customHeight="1"/>'
+    '<cols>'
+    + "".join(
+        f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+        for i, width in enumerate(COLUMN_WIDTHS, start=1)
+    )
+    + '</cols>'
+    '<sheetData>'
+    + _sheet_row(1, HEADERS, HEADER_STYLE)
+).encode()
+
+_SHEET_TAIL = b'</sheetData></worksheet>'
+
+# Parts that are byte-for-byte the same in every workbook. They are a few
+# KB at most, so they are stored as-is instead of being deflated again on
+# every request; only sheet1.xml is compressed.
+_TEMPLATE_PARTS = {
+    "[Content_Types].xml": CONTENT_TYPES_XML,
+    "_rels/.rels": ROOT_RELS_XML,
+    "xl/workbook.xml": WORKBOOK_XML,
+    "xl/_rels/workbook.xml.rels": WORKBOOK_RELS_XML,
+    "xl/styles.xml": STYLES_XML,
+}
+
+def _write_xlsx_direct(rows, file):
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in _TEMPLATE_PARTS.items():
+            info = zipfile.ZipInfo(name)
+            info.compress_type = zipfile.ZIP_STORED
+            zf.writestr(info, data)
+
+        # rows are compressed into the archive as they are produced,
+        # so the sheet never has to exist in memory as a whole
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_SHEET_HEAD)
+            for r, row in enumerate(rows, start=2):
+                sheet.write(_sheet_row(r, row, DATA_STYLE).encode())
+            sheet.write(_SHEET_TAIL)
 
 # ---------------- HEALTH CHECK ----------------
 @app.api_route("/ping", methods=["GET", "HEAD"])
@@ -104,71 +460,59 @@ def ping():
     return {"status": "alive"}
 
 # ---------------- API ----------------
-@app.post("/generate-excel")
-def generate_excel(
-    records: List[LoanInput],
-    background_tasks: BackgroundTasks
-):
-    if not records:
-        raise HTTPException(status_code=400, detail="No records provided")
-
-    rows = [process_record(r) for r in records]
-    df = pd.DataFrame(rows)
+def _build_workbook(raw: List[dict]) -> bytes:
+    records, columns = load_records(raw)
+    rows = process_records(records, columns)
 
-    file_name = f"/tmp/loan_{uuid.uuid4().hex}.xlsx"
+    # built in memory, no temp file to write, re-read and clean up
+    buf = io.BytesIO()
 
     try:
-        df.to_excel(file_name, index=False)
-
-        wb = load_workbook(file_name)
-        ws = wb.active
-
-        # ----- COLUMN WIDTHS -----
-        column_widths = {
-            "A": 25.71,
-            "B": 64.86,
-            "C": 39.71,
-            "D": 27.14,
-            "E": 47.14,
-            "F": 39.29,
-            "G": 38.43,
-            "H": 94.43,
-            "I": 46.86,
-            "J": 26.14
-        }
-
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
+        _write_xlsx_direct(rows, buf)
 
-        # ----- ROW HEIGHT -----
-        for r in range(1, ws.max_row + 1):
-            ws.row_dimensions[r].height = 18.75
-
-        header_font = Font(bold=True, size=14)
-        data_font = Font(size=14)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    return buf.getvalue()
 
-        for row in ws.iter_rows(min_row=2):
-            for cell in row:
-                cell.font = data_font
-                cell.alignment = Alignment(vertical="center", wrap_text=True)
+# The body is read raw, so its schema is declared for the docs by hand.
+# LoanInput has only plain fields, so its schema needs no $defs.
+_RECORDS_SCHEMA = {
+    "type": "array",
+    "items": TypeAdapter(LoanInput).json_schema(),
+}
 
-        ws.freeze_panes = "A2"
-        wb.save(file_name)
+@app.post(
+    "/generate-excel",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": _RECORDS_SCHEMA}},
+            "required": True,
+        }
+    },
+)
+async def generate_excel(request: Request):
+    # The body is decoded with orjson straight into plain dicts; the
+    # fields are checked in bulk by load_records.
+    try:
+        records = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {e}")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if not isinstance(records, list):
+        raise HTTPException(status_code=422, detail="Expected a list of records")
+    if not records:
+        raise HTTPException(status_code=400, detail="No records provided")
 
-    # Auto-delete file after response
-    background_tasks.add_task(os.remove, file_name)
+    # CPU-bound, keep it off the event loop
+    content = await run_in_threadpool(_build_workbook, records)
 
-    return FileResponse(
-        path=file_name,
-        filename="loan_calculation.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return Response(
+        content=content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": 'attachment; filename="loan_calculation.xlsx"'
+        }
     )
 
 # Start app: